@@ -0,0 +1,114 @@
+import io
+import re
+import json
+import pdfplumber
+import docx2txt
+
+# Gemini model, shared by the app and the regression suite so recorded
+# fixtures stay keyed to the model that serves them
+MODEL_NAME = "gemini-2.5-pro"
+
+# ---------------------------
+# Prompt Templates
+# ---------------------------
+PROMPT = """
+You are an expert career coach. Analyze this resume text:
+
+{resume_text}
+
+IMPORTANT:
+- Reply ONLY with a valid JSON object.
+- Do NOT include explanations, markdown, or extra text.
+- Ensure keys are exactly:
+  resume_score (int 0–100),
+  structure_feedback (list of strings),
+  strengths (list of strings),
+  improvement_areas (list of strings),
+  recommended_skills (list of strings),
+  recommended_courses (dict with skill: list of 2 courses)
+"""
+
+TAILOR_PROMPT = """
+You are an expert resume writer. Rewrite the following resume:
+
+{resume_text}
+
+To align it with this job description:
+
+{job_description}
+
+IMPORTANT:
+- Keep the format professional and ATS-friendly.
+- Highlight relevant experiences, skills, and keywords from the job description.
+- Do NOT fabricate experiences.
+- Return only the improved resume text (no explanations).
+"""
+
+COVER_LETTER_PROMPT = """
+You are an expert career consultant. Write a professional cover letter:
+- Base it on this resume:
+{resume_text}
+
+- Tailor it for this job description:
+{job_description}
+
+IMPORTANT:
+- Make it ATS-friendly and concise (max 400 words).
+- Keep a professional tone.
+- Highlight relevant experiences without fabricating.
+- Return only the cover letter text.
+"""
+
+KEYWORD_PROMPT = """
+Extract the top 15 keywords (skills, tools, certifications, job-related terms) from this job description:
+
+{job_description}
+
+Return ONLY a valid JSON list, e.g. ["Python", "Data Analysis", "Machine Learning"]
+"""
+
+# ---------------------------
+# File Extraction
+# ---------------------------
+def read_text(file):
+    text = ""
+    if file.type == "application/pdf":
+        with pdfplumber.open(file) as pdf:
+            for p in pdf.pages:
+                text += p.extract_text() or ""
+    elif file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+        text = docx2txt.process(file)
+    elif file.type == "text/plain":
+        text = file.read().decode("utf-8")
+    return text
+
+def read_bytes(mime_type, data):
+    """read_text() for raw file contents, e.g. in a worker process."""
+    file = io.BytesIO(data)
+    file.type = mime_type
+    return read_text(file)
+
+# ---------------------------
+# Response Parsing
+# ---------------------------
+def clean_response(text):
+    return re.sub(r"^```json|```$", "", text.strip(), flags=re.MULTILINE).strip()
+
+def parse_analysis(raw_text):
+    """Analysis dict from a cleaned PROMPT response, or None if it is not valid JSON."""
+    try:
+        return json.loads(raw_text)
+    except Exception:
+        return None
+
+def parse_keywords(raw_text, job_description):
+    try:
+        return json.loads(raw_text)
+    except:
+        return re.findall(r"\b[A-Z][a-zA-Z0-9+/#&-]{2,}\b", job_description)
+
+def match_keywords(keywords, resume_text):
+    resume_lower = resume_text.lower()
+    matched = [kw for kw in keywords if kw.lower() in resume_lower]
+    missing = [kw for kw in keywords if kw.lower() not in resume_lower]
+    return matched, missing
@@ -0,0 +1,469 @@
+import os
+import time
+import pickle
+import hashlib
+import socket
+import threading
+import uuid
+from collections import OrderedDict
+
+# ---------------------------
+# Configuration
+# ---------------------------
+# CACHE_BACKEND picks where results live: "memory" (this process only),
+# "disk" (shared by replicas mounting the same CACHE_DIR) or "redis"
+# (shared through REDIS_URL). Non-memory backends get a small in-process
+# tier in front of them so repeat reruns on the same replica stay local.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "resume-analyzer"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CACHE_TTL = int(os.getenv("CACHE_TTL", "86400"))
+CACHE_MEMORY_ENTRIES = int(os.getenv("CACHE_MEMORY_ENTRIES", "256"))
+CACHE_MEMORY_BYTES = int(os.getenv("CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+CACHE_DISK_BYTES = int(os.getenv("CACHE_DISK_BYTES", str(1024 * 1024 * 1024)))
+REPLICA_ID = os.getenv("REPLICA_ID", socket.gethostname())
+
+LOCK_TTL = 120
+LOCK_POLL_INTERVAL = 0.2
+DISK_SWEEP_INTERVAL = 300
+
+
+def make_key(namespace, *parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(part)
+        digest.update(b"\0")
+    return f"{namespace}:{digest.hexdigest()}"
+
+
+# ---------------------------
+# Backends
+# ---------------------------
+class CacheBackend:
+    """Byte-oriented key/value store with an atomic set-if-absent for locks."""
+
+    name = "base"
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        raise NotImplementedError
+
+    def add(self, key, value, ttl=None):
+        """Store value only if key is absent; return True if it was stored."""
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def delete_if(self, key, value):
+        """Delete key only if it still holds value (a lock owner's token)."""
+        raise NotImplementedError
+
+    def record(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def record_late_hit(self):
+        """A lookup already counted as a miss was served after all, by
+        another holder filling the key while the caller waited."""
+        with self._stats_lock:
+            self.misses -= 1
+            self.hits += 1
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class MemoryCache(CacheBackend):
+    name = "memory"
+
+    def __init__(self, max_entries=CACHE_MEMORY_ENTRIES, max_bytes=CACHE_MEMORY_BYTES):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pop(self, key):
+        value, _ = self._data.pop(key)
+        self.bytes -= len(value)
+
+    def _put(self, key, value, ttl):
+        if key in self._data:
+            self._pop(key)
+        self._data[key] = (value, time.time() + ttl if ttl else None)
+        self.bytes += len(value)
+        while len(self._data) > self.max_entries or (self.bytes > self.max_bytes and len(self._data) > 1):
+            self._pop(next(iter(self._data)))
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires < time.time():
+            self._pop(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key):
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._put(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._put(key, value, ttl)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+
+    def size(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return len(entry[0]) if entry else 0
+
+    def delete_if(self, key, value):
+        with self._lock:
+            if self._live(key) == value:
+                self._pop(key)
+
+
+class DiskCache(CacheBackend):
+    """One file per key. Expired entries are dropped when read and by a
+    sweep every DISK_SWEEP_INTERVAL seconds, which also trims the oldest
+    entries once the directory holds more than max_bytes; most resumes are
+    never looked up again, so reads alone would let it grow forever."""
+
+    name = "disk"
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_DISK_BYTES):
+        super().__init__()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._last_sweep = 0.0
+        self._sweep_lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                expires = float(f.readline())
+                value = f.read()
+        except (OSError, ValueError):
+            return None
+        if expires and expires < time.time():
+            self.delete(key)
+            return None
+        return value
+
+    def _write(self, path, value, ttl):
+        expires = time.time() + ttl if ttl else 0
+        # Write-then-rename so readers on other replicas never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(self.directory, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(f"{expires}\n".encode("ascii"))
+            f.write(value)
+        os.replace(tmp_path, path)
+
+    def set(self, key, value, ttl=None):
+        self._write(self._path(key), value, ttl)
+        self._maybe_sweep()
+
+    def add(self, key, value, ttl=None):
+        path = self._path(key)
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            # get() drops an expired entry left behind by a crashed holder,
+            # in which case the slot is free again
+            self.get(key)
+            if os.path.exists(path):
+                return False
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                return False
+        expires = time.time() + ttl if ttl else 0
+        with os.fdopen(fd, "wb") as f:
+            f.write(f"{expires}\n".encode("ascii"))
+            f.write(value)
+        return True
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def delete(self, key):
+        self._remove(self._path(key))
+
+    def _maybe_sweep(self):
+        now = time.time()
+        if now - self._last_sweep < DISK_SWEEP_INTERVAL or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_sweep = now
+            self.sweep()
+        finally:
+            self._sweep_lock.release()
+
+    def sweep(self):
+        now = time.time()
+        live = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+                if name.endswith(".tmp"):
+                    # Left behind by a writer that died before its rename
+                    if stat.st_mtime < now - LOCK_TTL:
+                        self._remove(path)
+                    continue
+                with open(path, "rb") as f:
+                    expires = float(f.readline())
+            except (OSError, ValueError):
+                continue
+            if expires and expires < now:
+                self._remove(path)
+            else:
+                live.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in live)
+        for _, size, path in sorted(live):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def delete_if(self, key, value):
+        # Not atomic across replicas, but a lock is only taken over once its
+        # TTL has passed, so the window between the check and the remove is
+        # far shorter than the gap it guards against
+        if self.get(key) == value:
+            self.delete(key)
+
+
+class RedisCache(CacheBackend):
+    """Backend for anything speaking the Redis protocol.
+
+    Takes a redis-py compatible client, so a local stand-in such as
+    fakeredis or a throwaway redis-server works the same as production.
+    """
+
+    name = "redis"
+
+    DELETE_IF_SCRIPT = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+        return redis.call("del", KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, client=None, url=REDIS_URL, prefix="resume-analyzer:"):
+        super().__init__()
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def add(self, key, value, ttl=None):
+        return bool(self.client.set(self.prefix + key, value, ex=ttl, nx=True))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def delete_if(self, key, value):
+        self.client.eval(self.DELETE_IF_SCRIPT, 1, self.prefix + key, value)
+
+
+# ---------------------------
+# Result cache
+# ---------------------------
+class ResultCache:
+    """Tiered cache of pickled results with cross-replica single-flight.
+
+    Lookups go through the tiers in order and backfill the faster ones on a
+    hit. On a miss, the computation is guarded by a lock in the last
+    (shared) tier so two replicas never issue the same model call at once;
+    the loser waits for the winner's result instead.
+
+    demote() moves an entry out of the in-process tier to `spill` (or to the
+    shared tier when there is one); reading it with backfill=False then
+    serves it from there without pulling it back into memory.
+    """
+
+    def __init__(self, tiers, ttl=CACHE_TTL, replica=REPLICA_ID, spill=None):
+        self.tiers = tiers
+        self.ttl = ttl
+        self.replica = replica
+        self.spill = spill
+
+    def _lookup_tiers(self):
+        return self.tiers + [self.spill] if self.spill else self.tiers
+
+    def get(self, key, backfill=True):
+        for i, tier in enumerate(self._lookup_tiers()):
+            raw = tier.get(key)
+            tier.record(raw is not None)
+            if raw is not None:
+                if backfill:
+                    for faster in self.tiers[:i]:
+                        faster.set(key, raw, self.ttl)
+                return pickle.loads(raw)
+        return None
+
+    def set(self, key, value, resident=True):
+        """Store value in every tier, or with resident=False only out of
+        process (the shared tier or the spill), for bulk data that must not
+        push everyone else's entries out of the in-process tier."""
+        raw = pickle.dumps(value)
+        if resident:
+            for tier in self.tiers:
+                tier.set(key, raw, self.ttl)
+            return
+        for tier in self._lookup_tiers():
+            if not isinstance(tier, MemoryCache):
+                try:
+                    tier.set(key, raw, self.ttl)
+                except Exception:
+                    # Left uncached rather than failing the caller, as in demote()
+                    pass
+
+    def delete(self, key):
+        for tier in self._lookup_tiers():
+            tier.delete(key)
+
+    def _memory_tiers(self):
+        return [tier for tier in self.tiers if isinstance(tier, MemoryCache)]
+
+    def resident_bytes(self, key):
+        """Bytes this entry occupies in the process's own memory."""
+        return sum(tier.size(key) for tier in self._memory_tiers())
+
+    def demote(self, key):
+        """Move key out of process memory. Returns False, leaving it
+        resident, when there is nowhere to write it to."""
+        out = self.spill or self.tiers[-1]
+        memory_tiers = self._memory_tiers()
+        if out in memory_tiers:
+            return False
+        for tier in memory_tiers:
+            raw = tier.get(key)
+            if raw is not None:
+                try:
+                    out.set(key, raw, self.ttl)
+                except Exception:
+                    # e.g. a read-only spill directory or an unreachable Redis
+                    return False
+                break
+        for tier in memory_tiers:
+            tier.delete(key)
+        return True
+
+    def _peek(self, key):
+        # Lookup while waiting on another holder. The caller's get() already
+        # counted a miss in every tier; the one that serves it becomes a hit
+        for tier in self._lookup_tiers():
+            raw = tier.get(key)
+            if raw is not None:
+                tier.record_late_hit()
+                return pickle.loads(raw)
+        return None
+
+    def get_or_compute(self, key, compute, should_cache=bool, backfill=True):
+        value = self.get(key, backfill)
+        if value is not None:
+            return value
+
+        lock_tier = self.tiers[-1]
+        lock_key = f"lock:{key}"
+        # Unique per call, so a holder whose lock expired and was taken over
+        # by another replica does not release that replica's lock
+        token = f"{self.replica}:{uuid.uuid4().hex}".encode("utf-8")
+        deadline = time.time() + LOCK_TTL
+        while not lock_tier.add(lock_key, token, LOCK_TTL):
+            time.sleep(LOCK_POLL_INTERVAL)
+            value = self._peek(key)
+            if value is not None:
+                return value
+            if time.time() > deadline:
+                # Holder is stuck; do it ourselves
+                return self._compute_and_set(key, compute, should_cache)
+
+        try:
+            value = self._peek(key)
+            if value is None:
+                value = self._compute_and_set(key, compute, should_cache)
+            return value
+        finally:
+            lock_tier.delete_if(lock_key, token)
+
+    def _compute_and_set(self, key, compute, should_cache):
+        value = compute()
+        if should_cache(value):
+            self.set(key, value)
+        return value
+
+    def stats(self):
+        return {"replica": self.replica, "tiers": [tier.stats() for tier in self._lookup_tiers()]}
+
+    def memory_bytes(self):
+        return sum(tier.bytes for tier in self.tiers if isinstance(tier, MemoryCache))
+
+
+def create_cache(backend=CACHE_BACKEND):
+    if backend == "memory":
+        # Nothing shared to demote to, so large entries go to a local disk
+        # spill; its directory is only created once something is spilled
+        return ResultCache([MemoryCache()], spill=DiskCache(os.path.join(CACHE_DIR, "spill")))
+    if backend == "disk":
+        return ResultCache([MemoryCache(), DiskCache()])
+    if backend == "redis":
+        return ResultCache([MemoryCache(), RedisCache()])
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
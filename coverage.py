@@ -0,0 +1,220 @@
+import io
+import os
+import re
+import csv
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from analysis import read_bytes
+
+COVERAGE_WORKERS = int(os.getenv("COVERAGE_WORKERS", str(os.cpu_count() or 1)))
+
+# Quoted keywords, parentheses and whole-word operators; the text between
+# them is a bare keyword
+FILTER_TOKEN = re.compile(r'("[^"]*"|\(|\)|\b(?:AND|OR|NOT)\b)', re.IGNORECASE)
+
+
+def keyword_mask(keywords, text):
+    """Bit i is set when keywords[i] occurs in text (case-insensitive)."""
+    text_lower = text.lower()
+    mask = 0
+    for i, keyword in enumerate(keywords):
+        if keyword.lower() in text_lower:
+            mask |= 1 << i
+    return mask
+
+
+class CoverageMatrix:
+    """Candidates x keywords coverage for one job description.
+
+    Stored as bitsets both ways: `rows[j]` has bit i set when candidate j
+    covers keyword i, and `columns[i]` has bit j set for the same cell. Rows
+    give per-candidate counts for ranking; columns make filters a handful
+    of integer AND/OR operations no matter how many candidates there are.
+    `skipped` names the uploads no text could be read from; they are not
+    candidates.
+    """
+
+    def __init__(self, keywords, candidates, rows, skipped=()):
+        self.keywords = list(keywords)
+        self.candidates = list(candidates)
+        self.rows = list(rows)
+        self.skipped = list(skipped)
+        self.columns = [0] * len(self.keywords)
+        for j, row in enumerate(self.rows):
+            for i in range(len(self.keywords)):
+                if row >> i & 1:
+                    self.columns[i] |= 1 << j
+        self._index = {keyword.lower(): i for i, keyword in enumerate(self.keywords)}
+
+    # Cached and spilled as its constructor arguments only; the derived
+    # columns and index are rebuilt on load, so the pickled size that
+    # session memory accounts is what the matrix costs to hold
+    def __getstate__(self):
+        return {"keywords": self.keywords, "candidates": self.candidates, "rows": self.rows, "skipped": self.skipped}
+
+    def __setstate__(self, state):
+        self.__init__(state["keywords"], state["candidates"], state["rows"], state.get("skipped", ()))
+
+    def covers(self, j, keyword):
+        return bool(self.rows[j] >> self._index[keyword.lower()] & 1)
+
+    def matched(self, j):
+        return [kw for i, kw in enumerate(self.keywords) if self.rows[j] >> i & 1]
+
+    def _ranked(self, candidates=None):
+        indices = range(len(self.candidates)) if candidates is None else candidates
+        return sorted(indices, key=lambda j: self.rows[j].bit_count(), reverse=True)
+
+    def _summary(self, j):
+        total = len(self.keywords)
+        matched = self.rows[j].bit_count()
+        return {
+            "candidate": self.candidates[j],
+            "matched": matched,
+            "coverage": matched / total * 100 if total else 0.0,
+            "keywords": self.matched(j),
+        }
+
+    def rank(self, candidates=None):
+        """Candidates (all, or the given indices) by number of keywords covered, best first."""
+        return [self._summary(j) for j in self._ranked(candidates)]
+
+    # ---------------------------
+    # Filtering
+    # ---------------------------
+    def filter(self, expression):
+        """Indices of candidates matching e.g. "Python AND (Kubernetes OR Docker) AND NOT PHP".
+
+        Operators are case-insensitive; quote keywords that contain one or
+        a parenthesis, e.g. "C++ (Advanced)" OR "Research and Development".
+        """
+        tokens = []
+        for part in FILTER_TOKEN.split(expression):
+            part = part.strip()
+            if not part:
+                continue
+            if len(part) > 1 and part[0] == part[-1] == '"':
+                tokens.append(("keyword", part[1:-1].strip()))
+            elif part.upper() in ("AND", "OR", "NOT", "(", ")"):
+                tokens.append((part.upper(), part))
+            elif '"' in part:
+                raise ValueError(f"Unterminated quote in filter expression: {expression!r}")
+            else:
+                tokens.append(("keyword", part))
+        if not tokens:
+            return list(range(len(self.candidates)))
+        everyone = (1 << len(self.candidates)) - 1
+        pos = 0
+
+        def peek():
+            return tokens[pos][0] if pos < len(tokens) else None
+
+        def take(expected):
+            nonlocal pos
+            if peek() != expected:
+                raise ValueError(f"Invalid filter expression: {expression!r}")
+            pos += 1
+            return tokens[pos - 1][1]
+
+        def parse_or():
+            bits = parse_and()
+            while peek() == "OR":
+                take("OR")
+                bits |= parse_and()
+            return bits
+
+        def parse_and():
+            bits = parse_not()
+            while peek() == "AND":
+                take("AND")
+                bits &= parse_not()
+            return bits
+
+        def parse_not():
+            if peek() == "NOT":
+                take("NOT")
+                return everyone & ~parse_not()
+            if peek() == "(":
+                take("(")
+                bits = parse_or()
+                take(")")
+                return bits
+            keyword = take("keyword")
+            if keyword.lower() not in self._index:
+                raise ValueError(f"'{keyword}' is not one of the job description keywords")
+            return self.columns[self._index[keyword.lower()]]
+
+        bits = parse_or()
+        if peek() is not None:
+            raise ValueError(f"Invalid filter expression: {expression!r}")
+        return [j for j in range(len(self.candidates)) if bits >> j & 1]
+
+    # ---------------------------
+    # Export
+    # ---------------------------
+    def _records(self, candidates=None):
+        for j in self._ranked(candidates):
+            yield self._summary(j), [self.rows[j] >> i & 1 for i in range(len(self.keywords))]
+
+    def to_csv(self, candidates=None):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["candidate", "matched", "coverage"] + self.keywords)
+        for r, cells in self._records(candidates):
+            writer.writerow([r["candidate"], r["matched"], f"{r['coverage']:.1f}"] + cells)
+        return buffer.getvalue()
+
+    def to_parquet(self, candidates=None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+
+        records = list(self._records(candidates))
+        columns = {
+            "candidate": [r["candidate"] for r, _ in records],
+            "matched": [r["matched"] for r, _ in records],
+            "coverage": [r["coverage"] for r, _ in records],
+        }
+        for i, keyword in enumerate(self.keywords):
+            columns[keyword] = [bool(cells[i]) for _, cells in records]
+        buffer = io.BytesIO()
+        pq.write_table(pa.table(columns), buffer)
+        return buffer.getvalue()
+
+
+def read_or_empty(mime_type, data):
+    """read_bytes(), with "" for a file that cannot be read (a corrupt PDF,
+    a .txt that is not UTF-8) so one bad upload does not fail the batch."""
+    try:
+        return read_bytes(mime_type, data)
+    except Exception:
+        return ""
+
+
+def extract_texts(documents, workers=COVERAGE_WORKERS):
+    """Text of each (mime type, file bytes) pair, in order; "" where unreadable.
+
+    PDF and DOCX parsing is pure Python and CPU bound, so threads would
+    serialize on the GIL; batches are spread over worker processes instead.
+    Workers are spawned rather than forked because the app's server
+    threads may hold locks at fork time.
+    """
+    workers = min(workers, len(documents))
+    if workers < 2:
+        return [read_or_empty(mime_type, data) for mime_type, data in documents]
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(read_or_empty, *zip(*documents)))
+
+
+def build_coverage(keywords, candidates):
+    """Coverage of (name, resume text) candidates against a keyword set
+    extracted once; candidates without text are listed as skipped."""
+    candidates = list(candidates)
+    readable = [(name, text) for name, text in candidates if text]
+    rows = [keyword_mask(keywords, text) for _, text in readable]
+    skipped = [name for name, text in candidates if not text]
+    return CoverageMatrix(keywords, [name for name, _ in readable], rows, skipped)
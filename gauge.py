@@ -0,0 +1,203 @@
+import os
+import math
+import threading
+
+# ---------------------------
+# Configuration
+# ---------------------------
+# GAUGE_MODE=plotly keeps the interactive Plotly indicator; GAUGE_MODE=svg
+# renders a static SVG gauge instead, so the browser never has to load the
+# Plotly bundle and the server never imports Plotly.
+GAUGE_MODE = os.getenv("GAUGE_MODE", "plotly")
+
+FONT_COLOR = "#2d3748"
+BACKGROUND = "rgba(255,255,255,0.95)"
+BORDER_COLOR = "#e2e8f0"
+
+
+class Gauge:
+    """A 0-100 gauge whose Plotly figure is built once and patched per render.
+
+    Building `go.Figure(go.Indicator(...))` validates every property and
+    embeds the whole default template (Streamlit's, inside the app) in the
+    JSON sent to the browser. The template figure here is built on first
+    use and keeps only the template's layout part, since per-trace-type
+    templates never apply to an indicator, and each render only swaps in
+    the value. The figure is shared, so hold `lock` until it has been
+    serialized.
+    """
+
+    def __init__(self, title, bar_color, steps, height, reference=None, threshold=None):
+        self.title = title
+        self.bar_color = bar_color
+        self.steps = steps
+        self.height = height
+        self.reference = reference
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        self._figure = None
+
+    def _build_figure(self):
+        import plotly.io as pio
+        import plotly.graph_objects as go
+
+        gauge = {
+            "axis": {"range": [0, 100], "tickwidth": 2, "tickcolor": FONT_COLOR},
+            "bar": {"color": self.bar_color, "thickness": 0.8},
+            "bgcolor": "white",
+            "borderwidth": 3,
+            "bordercolor": BORDER_COLOR,
+            "steps": [{"range": [low, high], "color": color} for low, high, color in self.steps],
+        }
+        if self.threshold is not None:
+            gauge["threshold"] = {"line": {"color": "red", "width": 4}, "thickness": 0.8, "value": self.threshold}
+
+        indicator = go.Indicator(
+            mode="gauge+number+delta" if self.reference is not None else "gauge+number",
+            value=0,
+            domain={"x": [0, 1], "y": [0, 1]},
+            title={"text": self.title, "font": {"size": 24, "color": FONT_COLOR}},
+            gauge=gauge,
+        )
+        if self.reference is not None:
+            indicator.delta = {"reference": self.reference, "increasing": {"color": "green"}, "decreasing": {"color": "red"}}
+
+        fig = go.Figure(indicator)
+        default = pio.templates[pio.templates.default] if pio.templates.default else go.layout.Template()
+        fig.update_layout(
+            template=go.layout.Template(layout=default.layout),
+            height=self.height,
+            font={"color": FONT_COLOR, "family": "Inter"},
+            paper_bgcolor=BACKGROUND,
+            plot_bgcolor=BACKGROUND,
+        )
+        return fig
+
+    def figure(self, value):
+        if self._figure is None:
+            self._figure = self._build_figure()
+        self._figure.data[0].value = value
+        return self._figure
+
+    def svg(self, value):
+        cx, cy, radius, band = 200, 200, 150, 44
+
+        def point(v, r=radius):
+            angle = math.pi * (1 - max(0, min(100, v)) / 100)
+            return cx + r * math.cos(angle), cy - r * math.sin(angle)
+
+        def arc(low, high, color, width):
+            x0, y0 = point(low)
+            x1, y1 = point(high)
+            return (f'<path d="M {x0:.1f} {y0:.1f} A {radius} {radius} 0 0 1 {x1:.1f} {y1:.1f}" '
+                    f'fill="none" stroke="{color}" stroke-width="{width}"/>')
+
+        parts = [arc(0, 100, BORDER_COLOR, band + 6)]
+        parts += [arc(low, high, color, band) for low, high, color in self.steps]
+        if value > 0:
+            parts.append(arc(0, value, self.bar_color, band * 0.8))
+        if self.threshold is not None:
+            x0, y0 = point(self.threshold, radius - band * 0.4)
+            x1, y1 = point(self.threshold, radius + band * 0.4)
+            parts.append(f'<line x1="{x0:.1f}" y1="{y0:.1f}" x2="{x1:.1f}" y2="{y1:.1f}" stroke="red" stroke-width="4"/>')
+        for tick in range(0, 101, 20):
+            x, y = point(tick, radius + band / 2 + 14)
+            parts.append(f'<text x="{x:.1f}" y="{y:.1f}" font-size="13" text-anchor="middle" fill="{FONT_COLOR}">{tick}</text>')
+
+        parts.append(f'<text x="{cx}" y="{cy - 10}" font-size="56" font-weight="600" text-anchor="middle" '
+                     f'fill="{FONT_COLOR}">{value:.4g}</text>')
+        if self.reference is not None and value != self.reference:
+            delta = value - self.reference
+            arrow, color = ("▲", "green") if delta > 0 else ("▼", "red")
+            parts.append(f'<text x="{cx}" y="{cy + 26}" font-size="22" text-anchor="middle" '
+                         f'fill="{color}">{arrow}{abs(delta):.4g}</text>')
+
+        return (
+            f'<div style="background: {BACKGROUND}; height: {self.height}px; padding-top: 1rem; '
+            f'text-align: center; font-family: Inter, sans-serif; color: {FONT_COLOR};">'
+            f'<div style="font-size: 24px;">{self.title}</div>'
+            f'<svg viewBox="0 0 400 240" style="height: {self.height - 70}px; max-width: 100%;">{"".join(parts)}</svg>'
+            f'</div>'
+        )
+
+
+# ---------------------------
+# Gauges used by the app
+# ---------------------------
+SCORE_GAUGE = Gauge(
+    "Overall Resume Score",
+    bar_color="#667eea",
+    steps=[(0, 50, "#fed7d7"), (50, 80, "#feebc8"), (80, 100, "#c6f6d5")],
+    height=400,
+    reference=80,
+    threshold=90,
+)
+
+KEYWORD_GAUGE = Gauge(
+    "Keyword Match Rate",
+    bar_color="#10b981",
+    steps=[(0, 40, "#fed7d7"), (40, 70, "#feebc8"), (70, 100, "#c6f6d5")],
+    height=350,
+)
+
+
+# ---------------------------
+# Benchmark
+# ---------------------------
+# python gauge.py compares the per-rerun cost of the old approach (a new
+# figure every rerun) with the patched template and the SVG mode, measuring
+# the work Streamlit does for st.plotly_chart: to_dict() plus to_json().
+# Streamlit's Plotly template is installed first, as it is in the app.
+def _rebuild_figure(value):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=value,
+        domain={'x': [0, 1], 'y': [0, 1]},
+        title={'text': "Overall Resume Score", 'font': {'size': 24, 'color': '#2d3748'}},
+        delta={'reference': 80, 'increasing': {'color': "green"}, 'decreasing': {'color': "red"}},
+        gauge={'axis': {'range': [0, 100], 'tickwidth': 2, 'tickcolor': "#2d3748"},
+              'bar': {'color': "#667eea", 'thickness': 0.8},
+              'bgcolor': "white",
+              'borderwidth': 3,
+              'bordercolor': "#e2e8f0",
+              'steps': [{'range': [0, 50], 'color': '#fed7d7'},
+                       {'range': [50, 80], 'color': '#feebc8'},
+                       {'range': [80, 100], 'color': '#c6f6d5'}],
+              'threshold': {'line': {'color': "red", 'width': 4},
+                           'thickness': 0.8, 'value': 90}}
+    ))
+    fig.update_layout(
+        height=400,
+        font={'color': "#2d3748", 'family': "Inter"},
+        paper_bgcolor="rgba(255,255,255,0.95)",
+        plot_bgcolor="rgba(255,255,255,0.95)"
+    )
+    return fig
+
+
+def benchmark(runs=200):
+    import time
+    import plotly.io as pio
+    import streamlit.elements.plotly_chart  # sets pio.templates.default = "streamlit"
+
+    def measure(render):
+        render(0)
+        start = time.perf_counter()
+        for i in range(runs):
+            payload = render(i % 101)
+        return (time.perf_counter() - start) / runs * 1000, len(payload)
+
+    results = {
+        "rebuild": measure(lambda v: pio.to_json(_rebuild_figure(v).to_dict(), validate=False)),
+        "template": measure(lambda v: pio.to_json(SCORE_GAUGE.figure(v).to_dict(), validate=False)),
+        "svg": measure(SCORE_GAUGE.svg),
+    }
+    for name, (ms, size) in results.items():
+        print(f"{name:>8}: {ms:.3f} ms/render, {size} bytes")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
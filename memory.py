@@ -0,0 +1,154 @@
+import os
+import time
+import threading
+
+# ---------------------------
+# Configuration
+# ---------------------------
+SESSION_MEMORY_CAP = int(os.getenv("SESSION_MEMORY_CAP", str(2 * 1024 * 1024)))
+SESSION_IDLE_TIMEOUT = int(os.getenv("SESSION_IDLE_TIMEOUT", "1800"))
+IDLE_SWEEP_INTERVAL = 60
+
+
+class _Ref:
+    __slots__ = ("category", "key", "spilled")
+
+    def __init__(self, category, key):
+        self.category = category
+        self.key = key
+        self.spilled = False
+
+
+class _Session:
+    def __init__(self):
+        self.refs = {}
+        self.uploads = {}
+        self.last_seen = time.time()
+
+
+class SessionMemory:
+    """Per-session memory accounting, caps and idle eviction.
+
+    Results themselves live once, pickled, in the shared result cache; a
+    session only records which cache keys it uses (extracted text, analysis
+    results, generated documents). Its usage is what those keys occupy in
+    this process's memory tier right now, plus the uploads Streamlit holds
+    for it. Entries shared by several sessions count for each of them.
+
+    When a session's resident entries exceed `cap`, its largest ones are
+    demoted out of process (to disk or the shared backend) and are read
+    from there afterwards without coming back into memory; with nowhere
+    writable to demote to they stay resident and counted. Uploads cannot
+    be moved, so they are reported but left out of the cap. Sessions not
+    seen for `idle_timeout` seconds have the entries only they use demoted,
+    and `release(session_id)` is called so the app can drop what Streamlit
+    keeps for them.
+    """
+
+    def __init__(self, cache, cap=SESSION_MEMORY_CAP, idle_timeout=SESSION_IDLE_TIMEOUT, release=None):
+        self.cache = cache
+        self.cap = cap
+        self.idle_timeout = idle_timeout
+        self.release = release
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+
+    def _session(self, session_id):
+        session = self._sessions.setdefault(session_id, _Session())
+        session.last_seen = time.time()
+        return session
+
+    # Demoting pickles and writes to disk or Redis, so the methods below
+    # only decide what to move while the lock is held; the caller moves it
+    # after releasing the lock, and other sessions' reruns never wait on it
+    def _pop_idle(self):
+        """Idle sessions to release and the keys only they use."""
+        now = time.time()
+        if now - self._last_sweep <= IDLE_SWEEP_INTERVAL:
+            return [], set()
+        self._last_sweep = now
+        idle = [sid for sid, s in self._sessions.items() if now - s.last_seen > self.idle_timeout]
+        keys = set()
+        for session_id in idle:
+            keys |= {ref.key for ref in self._sessions.pop(session_id).refs.values() if not ref.spilled}
+        keys -= {ref.key for s in self._sessions.values() for ref in s.refs.values()}
+        return idle, keys
+
+    def _release_idle(self, idle, keys):
+        for key in keys:
+            self.cache.demote(key)
+        if self.release:
+            for session_id in idle:
+                self.release(session_id)
+
+    def _resident(self, session):
+        return {name: self.cache.resident_bytes(ref.key) for name, ref in session.refs.items() if not ref.spilled}
+
+    def _over_cap(self, session):
+        """The largest resident refs to demote to bring session under the cap."""
+        resident = self._resident(session)
+        total = sum(resident.values())
+        refs = []
+        for name in sorted(resident, key=resident.get, reverse=True):
+            if total <= self.cap:
+                break
+            refs.append(session.refs[name])
+            total -= resident[name]
+        return refs
+
+    def account(self, session_id, name, category, size):
+        with self._lock:
+            idle = self._pop_idle()
+            self._session(session_id).uploads[name] = (category, size)
+        self._release_idle(*idle)
+
+    def get_or_compute(self, session_id, name, category, key, compute, should_cache=bool):
+        with self._lock:
+            idle = self._pop_idle()
+            ref = self._session(session_id).refs.get(name)
+            spilled = ref is not None and ref.key == key and ref.spilled
+        self._release_idle(*idle)
+
+        # A spilled entry is read from where it was demoted to, not re-stored
+        value = self.cache.get_or_compute(key, compute, should_cache, backfill=not spilled)
+        if not should_cache(value) or (spilled and not self.cache.resident_bytes(key)):
+            return value
+
+        with self._lock:
+            session = self._session(session_id)
+            ref = session.refs.get(name)
+            if ref is None or ref.key != key:
+                ref = session.refs[name] = _Ref(category, key)
+            # Recomputed after the spilled copy expired, so resident again
+            ref.spilled = False
+            over_cap = self._over_cap(session)
+        for ref in over_cap:
+            if self.cache.demote(ref.key):
+                ref.spilled = True
+        return value
+
+    def _usage(self, session):
+        usage = {}
+        for category, size in session.uploads.values():
+            usage[category] = usage.get(category, 0) + size
+        for name, size in self._resident(session).items():
+            category = session.refs[name].category
+            usage[category] = usage.get(category, 0) + size
+        usage["total"] = sum(usage.values())
+        return usage
+
+    def usage(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            return self._usage(session) if session else {"total": 0}
+
+    def stats(self):
+        with self._lock:
+            totals = [self._usage(s)["total"] for s in self._sessions.values()]
+        return {
+            "sessions": len(totals),
+            "total_bytes": sum(totals),
+            "avg_bytes_per_session": sum(totals) / len(totals) if totals else 0,
+            "max_bytes_per_session": max(totals, default=0),
+        }
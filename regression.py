@@ -0,0 +1,243 @@
+"""Offline regression suite for analysis quality and latency.
+
+Runs every resume in the corpus through the same prompts and parsing the
+app uses (analysis.py), with model calls served from recorded fixtures, and
+compares the results against a stored baseline:
+
+    python regression.py --record             # capture fixtures (needs GEMINI_API_KEY)
+    python regression.py --update-baseline    # accept current results as the baseline
+    python regression.py                      # replay offline and check for regressions
+
+The corpus directory holds resumes (.pdf, .docx, .txt) and, optionally, a
+job_description.txt used for the keyword, tailoring and cover letter stages.
+The committed corpus, fixtures and baseline are synthetic (hand-written
+model responses), so the suite and tests/test_regression.py run offline
+out of the box; record real responses for a corpus of your own.
+Each stage reports model time (latency from the recordings, so identical
+between replays) and local time (text extraction and parsing, measured
+live). Model time is always checked against the baseline; local time
+depends on the machine and load, so it is only checked with
+--check-local-time.
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+
+from analysis import (
+    MODEL_NAME, PROMPT, TAILOR_PROMPT, COVER_LETTER_PROMPT, KEYWORD_PROMPT,
+    read_text, clean_response, parse_analysis, parse_keywords, match_keywords,
+)
+from replay import RecordReplayModel, FixtureStore, MissingRecording, GEMINI_FIXTURES
+from scheduler import estimate_tokens
+
+REGRESSION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "regression")
+
+MIME_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".txt": "text/plain",
+}
+ANALYSIS_KEYS = [
+    "resume_score", "structure_feedback", "strengths",
+    "improvement_areas", "recommended_skills", "recommended_courses",
+]
+
+# Timing increases below this many seconds never count as a regression;
+# local ones that small are dominated by scheduling noise rather than by
+# the code under test
+LATENCY_FLOOR = 0.05
+
+
+class CorpusFile(io.BytesIO):
+    """A corpus resume shaped like a Streamlit upload, for read_text()."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            super().__init__(f.read())
+        self.name = os.path.basename(path)
+        self.type = MIME_TYPES[os.path.splitext(path)[1].lower()]
+
+
+def load_corpus(corpus_dir):
+    if not os.path.isdir(corpus_dir):
+        return [], None
+    resumes = sorted(
+        name for name in os.listdir(corpus_dir)
+        if os.path.splitext(name)[1].lower() in MIME_TYPES and name != "job_description.txt"
+    )
+    job_description = None
+    jd_path = os.path.join(corpus_dir, "job_description.txt")
+    if os.path.exists(jd_path):
+        with open(jd_path, encoding="utf-8") as f:
+            job_description = f.read()
+    return [os.path.join(corpus_dir, name) for name in resumes], job_description
+
+
+# ---------------------------
+# Pipeline
+# ---------------------------
+def valid_score(score):
+    return isinstance(score, int) and not isinstance(score, bool) and 0 <= score <= 100
+
+def run_resume(model, path, job_description):
+    """Run one resume through every stage; returns (result, errors)."""
+    stages = {}
+    errors = []
+    result = {"stages": stages}
+
+    def stage_stats(stage):
+        return stages.setdefault(stage, {"model_seconds": 0.0, "local_seconds": 0.0})
+
+    def call_model(stage, prompt):
+        stats = stage_stats(stage)
+        stats["prompt_tokens"] = estimate_tokens(prompt)
+        try:
+            response = model.generate_content(prompt)
+        except MissingRecording as e:
+            errors.append(f"{stage}: {e}")
+            return None
+        stats["model_seconds"] += getattr(response, "latency", 0.0)
+        stats["output_tokens"] = getattr(response, "output_tokens", None) or estimate_tokens(response.text)
+        return response.text
+
+    def timed(stage, fn, *args):
+        stats = stage_stats(stage)
+        start = time.perf_counter()
+        value = fn(*args)
+        stats["local_seconds"] += time.perf_counter() - start
+        return value
+
+    resume_text = timed("extract", read_text, CorpusFile(path))
+    if not resume_text:
+        errors.append("extract: no text extracted")
+        return result, errors
+
+    raw = call_model("analysis", PROMPT.format(resume_text=resume_text))
+    if raw is not None:
+        analysis = timed("analysis", parse_analysis, clean_response(raw))
+        if not isinstance(analysis, dict):
+            errors.append("analysis: response is not a valid JSON object")
+        else:
+            missing_keys = [key for key in ANALYSIS_KEYS if key not in analysis]
+            if missing_keys:
+                errors.append(f"analysis: missing keys {missing_keys}")
+            score = analysis.get("resume_score")
+            if valid_score(score):
+                result["score"] = score
+            else:
+                errors.append(f"analysis: resume_score {score!r} is not an int in 0-100")
+
+    if job_description:
+        raw = call_model("keywords", KEYWORD_PROMPT.format(job_description=job_description))
+        if raw is not None:
+            keywords = timed("keywords", parse_keywords, clean_response(raw), job_description)
+            matched, _ = timed("keywords", match_keywords, keywords, resume_text)
+            result["matched"] = sorted(matched)
+
+        for stage, template in [("tailor", TAILOR_PROMPT), ("cover_letter", COVER_LETTER_PROMPT)]:
+            raw = call_model(stage, template.format(resume_text=resume_text, job_description=job_description))
+            if raw is not None and not raw.strip():
+                errors.append(f"{stage}: empty response")
+
+    return result, errors
+
+
+# ---------------------------
+# Baseline comparison
+# ---------------------------
+def compare(name, result, baseline, args):
+    errors = []
+    if valid_score(baseline.get("score")) and valid_score(result.get("score")):
+        if abs(result["score"] - baseline["score"]) > args.score_tolerance:
+            errors.append(f"score {result['score']} differs from baseline {baseline['score']}")
+    if "matched" in baseline and "matched" in result and result["matched"] != baseline["matched"]:
+        errors.append(f"matched keywords {result.get('matched')} differ from baseline {baseline['matched']}")
+
+    for stage, base in baseline.get("stages", {}).items():
+        current = result["stages"].get(stage)
+        if current is None:
+            continue
+        timings = ["model_seconds", "local_seconds"] if args.check_local_time else ["model_seconds"]
+        for field in timings:
+            if field not in base:
+                continue
+            limit = max(base[field] * args.latency_threshold, base[field] + LATENCY_FLOOR)
+            if current[field] > limit:
+                errors.append(f"{stage}: {field} {current[field]:.3f}s exceeds baseline {base[field]:.3f}s")
+        for field in ("prompt_tokens", "output_tokens"):
+            if base.get(field) and current.get(field) and current[field] > base[field] * args.token_threshold:
+                errors.append(f"{stage}: {field} {current[field]} exceeds baseline {base[field]}")
+    return [f"{name}: {e}" for e in errors]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default=os.path.join(REGRESSION_DIR, "corpus"))
+    parser.add_argument("--fixtures", default=GEMINI_FIXTURES)
+    parser.add_argument("--baseline", default=os.path.join(REGRESSION_DIR, "baseline.json"))
+    parser.add_argument("--record", action="store_true", help="call Gemini and record fixtures")
+    parser.add_argument("--update-baseline", action="store_true", help="write current results as the baseline")
+    parser.add_argument("--latency-threshold", type=float, default=1.5, help="allowed ratio over baseline stage time")
+    parser.add_argument("--check-local-time", action="store_true", help="also check local processing time against the baseline")
+    parser.add_argument("--token-threshold", type=float, default=1.1, help="allowed ratio over baseline token counts")
+    parser.add_argument("--score-tolerance", type=int, default=0, help="allowed absolute score change")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        from dotenv import load_dotenv
+        import google.generativeai as genai
+
+        load_dotenv()
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        model = RecordReplayModel(genai.GenerativeModel(MODEL_NAME), MODEL_NAME, "record", FixtureStore(args.fixtures))
+    else:
+        model = RecordReplayModel(None, MODEL_NAME, "replay", FixtureStore(args.fixtures))
+
+    paths, job_description = load_corpus(args.corpus)
+    if not paths:
+        print(f"No resumes found in {args.corpus}")
+        return 1
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    errors = []
+    failures = []
+    for path in paths:
+        name = os.path.basename(path)
+        result, resume_errors = run_resume(model, path, job_description)
+        results[name] = result
+        errors += [f"{name}: {e}" for e in resume_errors]
+        failures += [f"{name}: {e}" for e in resume_errors]
+        if name in baseline:
+            failures += compare(name, result, baseline[name], args)
+        elif not args.update_baseline:
+            print(f"{name}: no baseline, run with --update-baseline to record one")
+
+        timings = ", ".join(
+            f"{stage} {s['model_seconds']:.3f}s model + {s['local_seconds']:.3f}s local"
+            for stage, s in result["stages"].items()
+        )
+        print(f"{name}: score {result.get('score')}, {len(result.get('matched', []))} keywords matched, {timings}")
+
+    if args.update_baseline and errors:
+        print(f"Baseline not written: the run had {len(errors)} errors")
+    elif args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(paths)} resumes, {len(failures)} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import os
+import json
+import time
+import hashlib
+
+# ---------------------------
+# Configuration
+# ---------------------------
+# GEMINI_RECORD_MODE=record captures every generate_content request and
+# response into GEMINI_FIXTURES; GEMINI_RECORD_MODE=replay serves them back
+# without touching the network; anything else passes calls straight through.
+GEMINI_RECORD_MODE = os.getenv("GEMINI_RECORD_MODE", "off")
+GEMINI_FIXTURES = os.getenv("GEMINI_FIXTURES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "regression", "fixtures"))
+
+
+class MissingRecording(LookupError):
+    """Replay was asked for a prompt that was never recorded."""
+
+
+class RecordedResponse:
+    """Stand-in for a Gemini response, exposing the parts the app reads."""
+
+    def __init__(self, recording):
+        self.recording = recording
+        self.text = recording["text"]
+        self.latency = recording["latency"]
+        self.prompt_tokens = recording["prompt_tokens"]
+        self.output_tokens = recording["output_tokens"]
+
+
+class FixtureStore:
+    """One JSON file per (model, prompt), named by their hash."""
+
+    def __init__(self, directory=GEMINI_FIXTURES):
+        self.directory = directory
+
+    def key(self, model_name, prompt):
+        return hashlib.sha256(f"{model_name}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, key, recording):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(key), "w", encoding="utf-8") as f:
+            json.dump(recording, f, indent=2, ensure_ascii=False, sort_keys=True)
+
+
+class RecordReplayModel:
+    """Wraps a model's generate_content with record/replay against a FixtureStore."""
+
+    def __init__(self, backend, model_name, mode=GEMINI_RECORD_MODE, store=None):
+        self.backend = backend
+        self.model_name = model_name
+        self.mode = mode
+        self.store = store or FixtureStore()
+
+    def generate_content(self, prompt, **kwargs):
+        if self.mode not in ("record", "replay"):
+            return self.backend.generate_content(prompt, **kwargs)
+
+        key = self.store.key(self.model_name, prompt)
+        if self.mode == "replay":
+            recording = self.store.load(key)
+            if recording is None:
+                raise MissingRecording(f"No recording for prompt {key[:12]}; record it before replaying")
+            return RecordedResponse(recording)
+
+        start = time.perf_counter()
+        response = self.backend.generate_content(prompt, **kwargs)
+        latency = time.perf_counter() - start
+        usage = getattr(response, "usage_metadata", None)
+        recording = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "text": response.text,
+            "latency": latency,
+            "prompt_tokens": getattr(usage, "prompt_token_count", None),
+            "output_tokens": getattr(usage, "candidates_token_count", None),
+        }
+        self.store.save(key, recording)
+        return RecordedResponse(recording)
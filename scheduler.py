@@ -0,0 +1,245 @@
+import os
+import time
+import heapq
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+# ---------------------------
+# Configuration
+# ---------------------------
+# GEMINI_RPM and GEMINI_TPM are the project's whole Gemini quota: requests
+# and (estimated) prompt tokens per minute. Each replica schedules its own
+# calls, so it admits an equal share of it; set GEMINI_REPLICAS to the
+# number of replicas sharing the API key.
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "4"))
+SCHEDULER_MAX_QUEUE = int(os.getenv("SCHEDULER_MAX_QUEUE", "200"))
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "60"))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "1000000"))
+GEMINI_REPLICAS = max(1, int(os.getenv("GEMINI_REPLICAS", "1")))
+
+# Priority classes, most urgent first
+INTERACTIVE = 0
+SPECULATIVE = 1
+BATCH = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", SPECULATIVE: "speculative", BATCH: "batch"}
+
+# Fraction of each quota bucket a class must leave untouched, so a burst of
+# batch work can never spend the headroom interactive page views rely on
+QUOTA_RESERVE = {INTERACTIVE: 0.0, SPECULATIVE: 0.2, BATCH: 0.5}
+
+WAIT_SAMPLES = 1000
+
+
+class Rejected(Exception):
+    """The queue was full and nothing of lower priority could make room."""
+
+
+class Preempted(Exception):
+    """A queued job was dropped to make room for higher-priority work."""
+
+
+def estimate_tokens(prompt):
+    return max(1, len(prompt) // 4)
+
+
+# ---------------------------
+# Quota
+# ---------------------------
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, reserve):
+        """Seconds until amount can be taken while keeping reserve (a fraction) in the bucket."""
+        self._refill()
+        # A single request larger than the usable bucket is let through once full
+        needed = min(amount + reserve * self.capacity, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def take(self, amount):
+        self._refill()
+        self.tokens -= amount
+
+
+# ---------------------------
+# Scheduler
+# ---------------------------
+class _Job:
+    __slots__ = ("priority", "tenant", "finish", "seq", "prompt", "kwargs", "cost", "future", "enqueued", "cancelled")
+
+    def __init__(self, priority, tenant, finish, seq, prompt, kwargs, cost):
+        self.priority = priority
+        self.tenant = tenant
+        self.finish = finish
+        self.seq = seq
+        self.prompt = prompt
+        self.kwargs = kwargs
+        self.cost = cost
+        self.future = Future()
+        self.enqueued = time.monotonic()
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.finish, self.seq) < (other.finish, other.seq)
+
+
+class _ClassStats:
+    def __init__(self):
+        self.depth = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.preempted = 0
+        self.rejected = 0
+        self.waits = deque(maxlen=WAIT_SAMPLES)
+
+    def as_dict(self):
+        waits = sorted(self.waits)
+        return {
+            "queue_depth": self.depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "preempted": self.preempted,
+            "rejected": self.rejected,
+            "avg_wait": sum(waits) / len(waits) if waits else 0.0,
+            "p95_wait": waits[int(len(waits) * 0.95)] if waits else 0.0,
+        }
+
+
+class Scheduler:
+    """Front door for every `generate_content` call.
+
+    Jobs are served strictly by priority class. Within a class, tenants
+    share the workers by weighted fair queuing: each job gets a virtual
+    finish tag of max(class clock, tenant's last tag) + 1/weight and the
+    smallest tag runs next, so one tenant submitting 500 jobs cannot push
+    another tenant's single job to the back. Dispatch is gated by
+    request and token quota buckets with per-class reserves, and when the
+    queue is full a new job evicts the most recently tagged job of the
+    lowest class below it.
+    """
+
+    def __init__(self, backend, workers=SCHEDULER_WORKERS, max_queue=SCHEDULER_MAX_QUEUE,
+                 requests_per_minute=GEMINI_RPM / GEMINI_REPLICAS,
+                 tokens_per_minute=GEMINI_TPM / GEMINI_REPLICAS):
+        self.backend = backend
+        self.max_queue = max_queue
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+        self._queues = {p: [] for p in PRIORITY_NAMES}
+        self._clock = {p: 0.0 for p in PRIORITY_NAMES}
+        self._last_finish = {p: {} for p in PRIORITY_NAMES}
+        self._stats = {p: _ClassStats() for p in PRIORITY_NAMES}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+        self._workers = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, prompt, priority=INTERACTIVE, tenant="default", weight=1.0, **kwargs):
+        with self._cond:
+            stats = self._stats[priority]
+            stats.submitted += 1
+            if self._depth() >= self.max_queue and not self._preempt_below(priority):
+                stats.rejected += 1
+                future = Future()
+                future.set_exception(Rejected(f"{PRIORITY_NAMES[priority]} queue is full"))
+                return future
+
+            last = self._last_finish[priority].get(tenant, 0.0)
+            finish = max(self._clock[priority], last) + 1.0 / weight
+            self._last_finish[priority][tenant] = finish
+            job = _Job(priority, tenant, finish, next(self._seq), prompt, kwargs, estimate_tokens(prompt))
+            heapq.heappush(self._queues[priority], job)
+            stats.depth += 1
+            self._cond.notify()
+            return job.future
+
+    def generate_content(self, prompt, priority=INTERACTIVE, tenant="default", weight=1.0, **kwargs):
+        return self.submit(prompt, priority, tenant, weight, **kwargs).result()
+
+    def stats(self):
+        with self._cond:
+            return {PRIORITY_NAMES[p]: s.as_dict() for p, s in self._stats.items()}
+
+    def _depth(self):
+        return sum(s.depth for s in self._stats.values())
+
+    def _preempt_below(self, priority):
+        for victim_class in sorted(PRIORITY_NAMES, reverse=True):
+            if victim_class <= priority:
+                return False
+            live = [job for job in self._queues[victim_class] if not job.cancelled and not job.future.done()]
+            if live:
+                victim = max(live)
+                victim.cancelled = True
+                self._stats[victim_class].depth -= 1
+                self._stats[victim_class].preempted += 1
+                victim.future.set_exception(Preempted(f"preempted by {PRIORITY_NAMES[priority]} work"))
+                return True
+        return False
+
+    def _head(self, priority):
+        queue = self._queues[priority]
+        while queue and queue[0].cancelled:
+            heapq.heappop(queue)
+        return queue[0] if queue else None
+
+    def _next_job(self):
+        """Pop the next admissible job, or return the seconds to wait before retrying."""
+        for priority in sorted(PRIORITY_NAMES):
+            job = self._head(priority)
+            if job is None:
+                continue
+            reserve = QUOTA_RESERVE[priority]
+            wait = max(self.requests.wait_time(1, reserve), self.tokens.wait_time(job.cost, reserve))
+            if wait > 0:
+                # Lower classes keep larger reserves, so they cannot go either
+                return wait
+            heapq.heappop(self._queues[priority])
+            self.requests.take(1)
+            self.tokens.take(job.cost)
+            self._clock[priority] = job.finish
+            self._stats[priority].depth -= 1
+            if self._head(priority) is None:
+                # Every tag handed out is now behind the clock
+                self._last_finish[priority].clear()
+            return job
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while not isinstance(job, _Job):
+                    self._cond.wait(timeout=job)
+                    job = self._next_job()
+                self._stats[job.priority].waits.append(time.monotonic() - job.enqueued)
+
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = self.backend.generate_content(job.prompt, **job.kwargs)
+            except Exception as e:
+                with self._cond:
+                    self._stats[job.priority].failed += 1
+                job.future.set_exception(e)
+            else:
+                with self._cond:
+                    self._stats[job.priority].completed += 1
+                job.future.set_result(result)
@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache
+from cache import ResultCache, MemoryCache, DiskCache, RedisCache
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(cache, "LOCK_POLL_INTERVAL", 0.01)
+
+
+def redis_replica(server):
+    return ResultCache([MemoryCache(), RedisCache(fakeredis.FakeRedis(server=server))])
+
+
+def test_single_flight_across_replicas():
+    server = fakeredis.FakeServer()
+    replicas = [redis_replica(server), redis_replica(server)]
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"score": 80}
+
+    results = []
+    threads = [threading.Thread(target=lambda r=r: results.append(r.get_or_compute("k", compute))) for r in replicas]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"score": 80}, {"score": 80}]
+    # The replica that waited was served from the shared tier
+    shared = [r.tiers[-1].stats() for r in replicas]
+    assert sorted(s["hits"] for s in shared) == [0, 1]
+    assert sorted(s["misses"] for s in shared) == [0, 1]
+
+
+@pytest.mark.parametrize("make", [
+    lambda tmp_path: MemoryCache(),
+    lambda tmp_path: DiskCache(str(tmp_path)),
+    lambda tmp_path: RedisCache(fakeredis.FakeRedis()),
+])
+def test_delete_if_releases_only_own_token(make, tmp_path):
+    backend = make(tmp_path)
+    assert backend.add("lock:k", b"mine", 60)
+    assert not backend.add("lock:k", b"theirs", 60)
+
+    backend.delete_if("lock:k", b"theirs")
+    assert backend.get("lock:k") == b"mine"
+    backend.delete_if("lock:k", b"mine")
+    assert backend.get("lock:k") is None
+
+
+def test_disk_add_takes_over_expired_entry(tmp_path, monkeypatch):
+    backend = DiskCache(str(tmp_path))
+    assert backend.add("lock:k", b"stale", 1)
+    assert not backend.add("lock:k", b"new", 1)
+
+    now = time.time()
+    monkeypatch.setattr(cache.time, "time", lambda: now + 5)
+    assert backend.add("lock:k", b"new", 60)
+    assert backend.get("lock:k") == b"new"
+
+
+def test_get_backfills_faster_tiers(tmp_path):
+    memory, disk = MemoryCache(), DiskCache(str(tmp_path))
+    result_cache = ResultCache([memory, disk])
+    ResultCache([disk]).set("k", "value")
+
+    assert result_cache.get("k", backfill=False) == "value"
+    assert memory.get("k") is None
+    assert result_cache.get("k") == "value"
+    assert memory.get("k") is not None
+
+
+def test_stats_per_tier(tmp_path):
+    result_cache = ResultCache([MemoryCache(), DiskCache(str(tmp_path))], replica="r1")
+    result_cache.get_or_compute("k", lambda: "value")
+    result_cache.get("k")
+
+    stats = result_cache.stats()
+    assert stats["replica"] == "r1"
+    memory, disk = stats["tiers"]
+    assert (memory["backend"], memory["hits"], memory["misses"], memory["hit_rate"]) == ("memory", 1, 1, 0.5)
+    assert (disk["backend"], disk["hits"], disk["misses"]) == ("disk", 0, 1)
+
+
+def test_disk_sweep_drops_expired_and_trims_to_size(tmp_path, monkeypatch):
+    backend = DiskCache(str(tmp_path), max_bytes=250)
+    backend.set("expired", b"x" * 10, 1)
+    for i in range(4):
+        backend.set(f"k{i}", b"x" * 100)
+        path = backend._path(f"k{i}")
+        os.utime(path, (i, i))
+
+    now = time.time()
+    monkeypatch.setattr(cache.time, "time", lambda: now + 5)
+    backend.sweep()
+
+    assert not os.path.exists(backend._path("expired"))
+    # Oldest entries go first until the directory fits
+    assert [backend.get(f"k{i}") is not None for i in range(4)] == [False, False, True, True]
@@ -0,0 +1,71 @@
+import os
+import sys
+import pickle
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache
+from cache import create_cache, MemoryCache
+from coverage import CoverageMatrix, build_coverage, extract_texts
+
+KEYWORDS = ["Python", "C++ (Advanced)", "Research and Development", "PHP"]
+
+
+def test_unreadable_files_are_skipped():
+    documents = [
+        ("text/plain", b"Python and PHP"),
+        ("application/pdf", b"%PDF-1.4 not really a pdf"),
+        ("text/plain", "Python".encode("utf-16")),
+        ("text/plain", b"C++ (Advanced)"),
+    ]
+    texts = extract_texts(documents, workers=1)
+    assert texts[1:3] == ["", ""]
+
+    matrix = build_coverage(KEYWORDS, zip(["a", "broken.pdf", "utf16.txt", "b"], texts))
+    assert matrix.candidates == ["a", "b"]
+    assert matrix.skipped == ["broken.pdf", "utf16.txt"]
+    assert [r["candidate"] for r in matrix.rank()] == ["a", "b"]
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ('python and "C++ (Advanced)"', [1]),
+    ('"Research and Development" Or php', [0, 2]),
+    ("NOT (Python OR PHP)", []),
+    ("", [0, 1, 2]),
+])
+def test_filter(expression, expected):
+    matrix = CoverageMatrix(KEYWORDS, ["a", "b", "c"], [0b1101, 0b0011, 0b1001])
+    assert matrix.filter(expression) == expected
+
+
+@pytest.mark.parametrize("expression", ['"C++ (Advanced)', "Python AND", "(Python", "Rust"])
+def test_invalid_filter(expression):
+    matrix = CoverageMatrix(KEYWORDS, ["a"], [0b1])
+    with pytest.raises(ValueError):
+        matrix.filter(expression)
+
+
+def test_pickles_without_derived_data():
+    matrix = CoverageMatrix(KEYWORDS, ["a", "b"], [0b0101, 0b0011], skipped=["c"])
+    state = matrix.__getstate__()
+    assert set(state) == {"keywords", "candidates", "rows", "skipped"}
+    copy = pickle.loads(pickle.dumps(matrix))
+    assert copy.columns == matrix.columns
+    assert copy.skipped == ["c"]
+    assert copy.filter("Python AND NOT PHP") == matrix.filter("Python AND NOT PHP")
+
+
+def test_bulk_texts_stay_out_of_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path))
+    result_cache = create_cache("memory")
+    result_cache.set("analysis", {"score": 80})
+    for j in range(300):
+        result_cache.set(f"text{j}", "resume text", resident=False)
+
+    memory = result_cache.tiers[0]
+    assert isinstance(memory, MemoryCache)
+    assert memory.get("analysis") is not None
+    assert result_cache.get("text0", backfill=False) == "resume text"
+    assert memory.get("text0") is None
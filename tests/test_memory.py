@@ -0,0 +1,110 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache
+import memory
+from cache import create_cache
+from memory import SessionMemory
+
+KB = 1024
+
+
+@pytest.fixture
+def result_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path / "cache"))
+    return create_cache("memory")
+
+
+class Compute:
+    def __init__(self, size):
+        self.size = size
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return "x" * self.size
+
+
+def test_spill_directory_created_lazily(result_cache, tmp_path):
+    assert not os.path.exists(tmp_path / "cache")
+    result_cache.set("k", "value")
+    assert not os.path.exists(tmp_path / "cache")
+
+
+def test_cap_demotes_largest_entries(result_cache):
+    sessions = SessionMemory(result_cache, cap=10 * KB)
+    sessions.account("s1", "upload", "uploads", 50 * KB)
+    sessions.get_or_compute("s1", "text", "texts", "k-text", Compute(4 * KB))
+    sessions.get_or_compute("s1", "letter", "documents", "k-letter", Compute(8 * KB))
+
+    # The 8 KB letter pushed the session over the cap and went to the spill;
+    # the upload is reported but cannot be spilled, so it is not capped
+    assert result_cache.resident_bytes("k-letter") == 0
+    assert result_cache.spill.get("k-letter") is not None
+    assert result_cache.resident_bytes("k-text") > 0
+    usage = sessions.usage("s1")
+    assert usage["uploads"] == 50 * KB
+    assert "documents" not in usage
+    assert usage["total"] == 50 * KB + result_cache.resident_bytes("k-text")
+
+
+def test_spilled_entry_is_read_without_backfill(result_cache, monkeypatch):
+    sessions = SessionMemory(result_cache, cap=KB)
+    compute = Compute(4 * KB)
+    sessions.get_or_compute("s1", "letter", "documents", "k", compute)
+    assert result_cache.resident_bytes("k") == 0
+
+    stores = []
+    monkeypatch.setattr(result_cache.spill, "set", lambda *args: stores.append(args))
+    for _ in range(3):
+        assert sessions.get_or_compute("s1", "letter", "documents", "k", compute) == "x" * 4 * KB
+    assert compute.calls == 1
+    assert stores == []
+    assert result_cache.resident_bytes("k") == 0
+
+
+def test_recompute_after_spilled_copy_expires(result_cache):
+    sessions = SessionMemory(result_cache, cap=KB)
+    compute = Compute(4 * KB)
+    sessions.get_or_compute("s1", "letter", "documents", "k", compute)
+
+    sessions.cap = 100 * KB
+    result_cache.spill.delete("k")
+    sessions.get_or_compute("s1", "letter", "documents", "k", compute)
+
+    assert compute.calls == 2
+    assert result_cache.resident_bytes("k") > 0
+    assert sessions.usage("s1")["documents"] == result_cache.resident_bytes("k")
+
+
+def test_unwritable_spill_keeps_entries_resident(result_cache, tmp_path):
+    (tmp_path / "file").write_text("")
+    result_cache.spill.directory = str(tmp_path / "file" / "spill")
+    sessions = SessionMemory(result_cache, cap=KB)
+
+    assert sessions.get_or_compute("s1", "letter", "documents", "k", Compute(4 * KB))
+    assert result_cache.resident_bytes("k") > 0
+    assert sessions.usage("s1")["documents"] == result_cache.resident_bytes("k")
+
+
+def test_idle_sessions_are_released(result_cache, monkeypatch):
+    released = []
+    sessions = SessionMemory(result_cache, idle_timeout=60, release=released.append)
+    sessions.get_or_compute("idle", "text", "texts", "k-own", Compute(KB))
+    sessions.get_or_compute("idle", "keywords", "results", "k-shared", Compute(KB))
+    sessions.get_or_compute("active", "keywords", "results", "k-shared", Compute(KB))
+
+    sessions._sessions["idle"].last_seen -= 120
+    monkeypatch.setattr(memory, "IDLE_SWEEP_INTERVAL", -1)
+    sessions.account("active", "upload", "uploads", KB)
+
+    assert released == ["idle"]
+    assert sessions.stats()["sessions"] == 1
+    # Only entries no live session uses leave memory
+    assert result_cache.resident_bytes("k-own") == 0
+    assert result_cache.spill.get("k-own") is not None
+    assert result_cache.resident_bytes("k-shared") > 0
@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import shutil
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import regression
+from analysis import MODEL_NAME, PROMPT
+from replay import FixtureStore
+
+
+@pytest.fixture
+def suite(tmp_path):
+    """A scratch copy of the committed corpus, fixtures and baseline."""
+    shutil.copytree(os.path.join(ROOT, "regression"), tmp_path / "regression")
+    return tmp_path / "regression"
+
+
+def run(suite, *extra):
+    return regression.main([
+        "--corpus", str(suite / "corpus"),
+        "--fixtures", str(suite / "fixtures"),
+        "--baseline", str(suite / "baseline.json"),
+        *extra,
+    ])
+
+
+def edit_analysis_fixture(suite, resume, edit):
+    store = FixtureStore(str(suite / "fixtures"))
+    with open(suite / "corpus" / resume, encoding="utf-8") as f:
+        key = store.key(MODEL_NAME, PROMPT.format(resume_text=f.read()))
+    recording = store.load(key)
+    edit(recording)
+    store.save(key, recording)
+
+
+def test_clean_pass(suite, capsys):
+    assert run(suite) == 0
+    assert "3 resumes, 0 failures" in capsys.readouterr().out
+
+
+def test_changed_prompt_fails(suite, capsys, monkeypatch):
+    monkeypatch.setattr(regression, "PROMPT", PROMPT + "\nKeep feedback under 50 words.\n")
+    assert run(suite) == 1
+    out = capsys.readouterr().out
+    assert "FAIL ana_lima.txt: analysis: No recording" in out
+    assert "3 resumes, 3 failures" in out
+
+
+def test_token_increase_fails(suite, capsys):
+    edit_analysis_fixture(suite, "ben_okafor.txt", lambda r: r.update(output_tokens=r["output_tokens"] * 2))
+    assert run(suite) == 1
+    assert "FAIL ben_okafor.txt: analysis: output_tokens" in capsys.readouterr().out
+
+
+def test_score_change_fails(suite, capsys):
+    edit_analysis_fixture(suite, "chen_wei.txt", lambda r: r.update(text=r["text"].replace('"resume_score": 71', '"resume_score": 60')))
+    assert run(suite) == 1
+    assert "FAIL chen_wei.txt: score 60 differs from baseline 71" in capsys.readouterr().out
+    assert run(suite, "--score-tolerance", "15") == 0
+
+
+@pytest.mark.parametrize("added, failures", [(regression.LATENCY_FLOOR * 0.8, 0), (regression.LATENCY_FLOOR * 2, 1)])
+def test_model_latency_floor(suite, capsys, added, failures):
+    # With no ratio allowance, only the floor absorbs small increases
+    edit_analysis_fixture(suite, "ana_lima.txt", lambda r: r.update(latency=r["latency"] + added))
+    assert run(suite, "--latency-threshold", "1.0") == (1 if failures else 0)
+    assert f"3 resumes, {failures} failures" in capsys.readouterr().out
+
+
+def test_baseline_not_written_from_failing_run(suite, capsys):
+    edit_analysis_fixture(suite, "ana_lima.txt", lambda r: r.update(text=r["text"].replace('"resume_score": 86', '"resume_score": "85"')))
+    before = (suite / "baseline.json").read_text()
+    assert run(suite, "--update-baseline") == 1
+    assert "Baseline not written" in capsys.readouterr().out
+    assert (suite / "baseline.json").read_text() == before
+    assert json.loads(before)["ana_lima.txt"]["score"] == 86
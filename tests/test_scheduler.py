@@ -0,0 +1,136 @@
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import Scheduler, Rejected, Preempted, INTERACTIVE, SPECULATIVE, BATCH
+
+
+class SimulatedModel:
+    """Records the order prompts reach the model; the "gate" prompt blocks
+    until released so tests can build up a queue behind a busy worker."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.order = []
+        self.gate = threading.Event()
+        self.gate_entered = threading.Event()
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, **kwargs):
+        if prompt == "gate":
+            self.gate_entered.set()
+            self.gate.wait(5)
+            return prompt
+        time.sleep(self.latency)
+        with self._lock:
+            self.order.append(prompt)
+        return prompt
+
+
+def blocked_scheduler(**kwargs):
+    model = SimulatedModel()
+    scheduler = Scheduler(model, workers=1, **kwargs)
+    scheduler.submit("gate", INTERACTIVE)
+    assert model.gate_entered.wait(5)
+    return model, scheduler
+
+
+def test_strict_priority_order():
+    model, scheduler = blocked_scheduler()
+    futures = [
+        scheduler.submit("batch", BATCH),
+        scheduler.submit("speculative", SPECULATIVE),
+        scheduler.submit("interactive", INTERACTIVE),
+    ]
+    model.gate.set()
+    for future in futures:
+        future.result(timeout=5)
+    assert model.order == ["interactive", "speculative", "batch"]
+
+
+def test_fair_queuing_across_tenants():
+    model, scheduler = blocked_scheduler()
+    futures = [scheduler.submit("a", BATCH, tenant="A") for _ in range(6)]
+    futures += [scheduler.submit("b", BATCH, tenant="B") for _ in range(2)]
+    model.gate.set()
+    for future in futures:
+        future.result(timeout=5)
+    # B's two jobs interleave with A's backlog instead of waiting behind it
+    assert "".join(model.order) == "ababaaaa"
+
+
+def test_weights_share_within_class():
+    model, scheduler = blocked_scheduler()
+    futures = [scheduler.submit("a", BATCH, tenant="A", weight=2.0) for _ in range(4)]
+    futures += [scheduler.submit("b", BATCH, tenant="B") for _ in range(2)]
+    model.gate.set()
+    for future in futures:
+        future.result(timeout=5)
+    assert "".join(model.order) == "aabaab"
+
+
+def test_preemption_and_rejection_counts():
+    model, scheduler = blocked_scheduler(max_queue=3)
+    batch = [scheduler.submit(f"batch{i}", BATCH) for i in range(3)]
+    interactive = scheduler.submit("interactive", INTERACTIVE)
+    # Queue is full again and nothing is below batch
+    rejected = scheduler.submit("late", BATCH)
+
+    with pytest.raises(Rejected):
+        rejected.result(timeout=5)
+    with pytest.raises(Preempted):
+        batch[-1].result(timeout=5)
+
+    model.gate.set()
+    assert interactive.result(timeout=5) == "interactive"
+    assert [f.result(timeout=5) for f in batch[:2]] == ["batch0", "batch1"]
+
+    stats = scheduler.stats()
+    assert stats["batch"]["preempted"] == 1
+    assert stats["batch"]["rejected"] == 1
+    assert stats["batch"]["completed"] == 2
+    assert stats["interactive"]["completed"] == 2
+    assert all(s["queue_depth"] == 0 for s in stats.values())
+
+
+def test_quota_wait_when_bucket_is_empty():
+    # 600 requests per minute refills one request every 0.1s
+    scheduler = Scheduler(SimulatedModel(), workers=1, requests_per_minute=600)
+    scheduler.requests.tokens = 0
+    start = time.monotonic()
+    scheduler.generate_content("x", INTERACTIVE)
+    assert time.monotonic() - start >= 0.09
+    assert scheduler.stats()["interactive"]["avg_wait"] >= 0.09
+
+
+def test_batch_keeps_quota_reserve_for_interactive():
+    scheduler = Scheduler(SimulatedModel(), workers=2, requests_per_minute=600)
+    # Half the bucket left: exactly batch's reserve, so batch must wait
+    scheduler.requests.tokens = 300
+    batch = scheduler.submit("batch", BATCH)
+    start = time.monotonic()
+    scheduler.generate_content("interactive", INTERACTIVE)
+    assert time.monotonic() - start < 0.05
+    assert not batch.done()
+    batch.result(timeout=5)
+    assert scheduler.stats()["batch"]["avg_wait"] >= 0.09
+
+
+def test_mixed_load_interactive_waits_less_than_batch():
+    model = SimulatedModel(latency=0.005)
+    scheduler = Scheduler(model, workers=2, requests_per_minute=100000)
+    batch = [scheduler.submit("batch", BATCH, tenant=f"bulk{i % 3}") for i in range(60)]
+    time.sleep(0.02)
+    interactive = [scheduler.submit("interactive", INTERACTIVE, tenant=f"user{i}") for i in range(10)]
+    for future in batch + interactive:
+        future.result(timeout=10)
+
+    stats = scheduler.stats()
+    assert stats["interactive"]["completed"] == 10
+    assert stats["batch"]["completed"] == 60
+    assert stats["interactive"]["p95_wait"] < stats["batch"]["p95_wait"]
@@ -1,15 +1,22 @@
 import streamlit as st
-import pdfplumber
-import docx2txt
 import os
-import json
-import re
+import io
 from dotenv import load_dotenv
 import google.generativeai as genai
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
-import tempfile
-import plotly.graph_objects as go
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from cache import create_cache, make_key
+from scheduler import Scheduler, Rejected, Preempted, INTERACTIVE
+from gauge import GAUGE_MODE, SCORE_GAUGE, KEYWORD_GAUGE
+from memory import SessionMemory
+from coverage import build_coverage, extract_texts
+from analysis import (
+    MODEL_NAME, PROMPT, TAILOR_PROMPT, COVER_LETTER_PROMPT, KEYWORD_PROMPT,
+    read_text, clean_response, parse_analysis, parse_keywords, match_keywords,
+)
+from replay import RecordReplayModel
 
 # ---------------------------
 # Load environment variables
@@ -19,8 +26,60 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 genai.configure(api_key=GEMINI_API_KEY)
 
-# Gemini model
-model = genai.GenerativeModel("gemini-2.5-pro")
+# ---------------------------
+# Model scheduler
+# ---------------------------
+# Every Gemini call in the process goes through one scheduler so interactive
+# page views, speculative precompute and batch jobs share the quota by
+# priority, and users within a class get a fair share of it.
+@st.cache_resource
+def get_scheduler():
+    return Scheduler(RecordReplayModel(genai.GenerativeModel(MODEL_NAME), MODEL_NAME))
+
+scheduler = get_scheduler()
+
+def current_tenant():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "default"
+
+def generate(prompt, priority=INTERACTIVE):
+    try:
+        return scheduler.generate_content(prompt, priority=priority, tenant=current_tenant())
+    except (Rejected, Preempted):
+        st.error("⏳ The AI service is busy right now. Please try again in a moment.")
+        st.stop()
+
+# ---------------------------
+# Result cache
+# ---------------------------
+# One cache per process, shared by all sessions. With CACHE_BACKEND=disk or
+# redis it is also shared across replicas, so a user bounced to another
+# replica does not pay for the same Gemini call again.
+@st.cache_resource
+def get_cache():
+    return create_cache()
+
+cache = get_cache()
+
+# ---------------------------
+# Session memory
+# ---------------------------
+# Sessions keep no copies of their texts, results and documents: they live
+# once in the result cache, and each session's share of it is capped by
+# moving its largest entries out of process. Idle sessions also give back
+# the uploads Streamlit holds for them, so memory stays flat under load.
+def release_session_files(session_id):
+    if Runtime.exists():
+        Runtime.instance().uploaded_file_mgr.remove_session_files(session_id)
+
+@st.cache_resource
+def get_session_memory():
+    return SessionMemory(cache, release=release_session_files)
+
+session_memory = get_session_memory()
+
+def remember(name, category, key, compute):
+    return session_memory.get_or_compute(current_tenant(), name, category, key, compute)
 
 # ---------------------------
 # Modern CSS Styling
@@ -360,149 +419,128 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# ---------------------------
-# Prompt Templates
-# ---------------------------
-PROMPT = """
-You are an expert career coach. Analyze this resume text:
-
-{resume_text}
-
-IMPORTANT:
-- Reply ONLY with a valid JSON object.
-- Do NOT include explanations, markdown, or extra text.
-- Ensure keys are exactly:
-  resume_score (int 0–100),
-  structure_feedback (list of strings),
-  strengths (list of strings),
-  improvement_areas (list of strings),
-  recommended_skills (list of strings),
-  recommended_courses (dict with skill: list of 2 courses)
-"""
-
-TAILOR_PROMPT = """
-You are an expert resume writer. Rewrite the following resume:
-
-{resume_text}
-
-To align it with this job description:
-
-{job_description}
-
-IMPORTANT:
-- Keep the format professional and ATS-friendly.
-- Highlight relevant experiences, skills, and keywords from the job description.
-- Do NOT fabricate experiences.
-- Return only the improved resume text (no explanations).
-"""
-
-COVER_LETTER_PROMPT = """
-You are an expert career consultant. Write a professional cover letter:
-- Base it on this resume:
-{resume_text}
-
-- Tailor it for this job description:
-{job_description}
-
-IMPORTANT:
-- Make it ATS-friendly and concise (max 400 words).
-- Keep a professional tone.
-- Highlight relevant experiences without fabricating.
-- Return only the cover letter text.
-"""
-
-KEYWORD_PROMPT = """
-Extract the top 15 keywords (skills, tools, certifications, job-related terms) from this job description:
-
-{job_description}
-
-Return ONLY a valid JSON list, e.g. ["Python", "Data Analysis", "Machine Learning"]
-"""
-
 # ---------------------------
 # File Extraction
 # ---------------------------
+def extract_key(file):
+    return make_key("extract", file.type, file.getvalue())
+
 def extract_text(file):
-    text = ""
-    if file.type == "application/pdf":
-        with pdfplumber.open(file) as pdf:
-            for p in pdf.pages:
-                text += p.extract_text() or ""
-    elif file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        text = docx2txt.process(file)
-    elif file.type == "text/plain":
-        text = file.read().decode("utf-8")
-    return text
+    return remember("resume_text", "texts", extract_key(file), lambda: read_text(file))
 
 # ---------------------------
 # Gemini Analysis
 # ---------------------------
 def analyze_with_gemini(text):
     prompt = PROMPT.format(resume_text=text)
-    response = model.generate_content(prompt)
-    raw_text = response.text.strip()
-    raw_text = re.sub(r"^```json|```$", "", raw_text, flags=re.MULTILINE).strip()
 
-    try:
-        return json.loads(raw_text)
-    except Exception:
-        st.error("⚠️ Could not parse Gemini response. Showing raw output below.")
-        st.code(raw_text, language="json")
-        return {}
+    def compute():
+        response = generate(prompt)
+        raw_text = clean_response(response.text)
+
+        result = parse_analysis(raw_text)
+        if result is None:
+            st.error("⚠️ Could not parse Gemini response. Showing raw output below.")
+            st.code(raw_text, language="json")
+            return {}
+        return result
+
+    return remember("analysis", "results", make_key("analysis", MODEL_NAME, prompt), compute)
 
 # ---------------------------
 # Tailor Resume
 # ---------------------------
 def tailor_resume(resume_text, job_description):
     prompt = TAILOR_PROMPT.format(resume_text=resume_text, job_description=job_description)
-    response = model.generate_content(prompt)
-    return response.text.strip()
+
+    def compute():
+        response = generate(prompt)
+        return response.text.strip()
+
+    return remember("tailored_resume", "documents", make_key("tailor", MODEL_NAME, prompt), compute)
 
 # ---------------------------
 # Cover Letter Generator
 # ---------------------------
 def generate_cover_letter(resume_text, job_description):
     prompt = COVER_LETTER_PROMPT.format(resume_text=resume_text, job_description=job_description)
-    response = model.generate_content(prompt)
-    return response.text.strip()
+
+    def compute():
+        response = generate(prompt)
+        return response.text.strip()
+
+    return remember("cover_letter", "documents", make_key("cover_letter", MODEL_NAME, prompt), compute)
 
 # ---------------------------
 # Keyword Optimization
 # ---------------------------
-def keyword_optimization(resume_text, job_description):
+def extract_keywords(job_description):
     prompt = KEYWORD_PROMPT.format(job_description=job_description)
-    response = model.generate_content(prompt)
-    raw_text = response.text.strip()
-    raw_text = re.sub(r"^```json|```$", "", raw_text, flags=re.MULTILINE).strip()
 
-    keywords = []
-    try:
-        keywords = json.loads(raw_text)
-    except:
-        keywords = re.findall(r"\b[A-Z][a-zA-Z0-9+/#&-]{2,}\b", job_description)
+    def compute():
+        response = generate(prompt)
+        return parse_keywords(clean_response(response.text), job_description)
 
-    resume_lower = resume_text.lower()
-    matched = [kw for kw in keywords if kw.lower() in resume_lower]
-    missing = [kw for kw in keywords if kw.lower() not in resume_lower]
+    # Keywords depend only on the job description, so every resume checked
+    # against the same posting reuses one model call
+    return remember("keywords", "results", make_key("keywords", MODEL_NAME, prompt), compute)
 
-    return matched, missing
+def keyword_optimization(resume_text, job_description):
+    keywords = extract_keywords(job_description)
+    return match_keywords(keywords, resume_text)
+
+# ---------------------------
+# Bulk Keyword Coverage
+# ---------------------------
+def bulk_coverage(job_description, files):
+    # One keyword extraction for the whole batch; resumes are only scanned
+    # locally. Their extracted text is cached out of process only, so a
+    # 500-resume batch does not push other sessions' results out of memory
+    def compute():
+        keywords = extract_keywords(job_description)
+        keys = [extract_key(f) for f in files]
+        texts = [cache.get(key, backfill=False) for key in keys]
+        missing = [j for j, text in enumerate(texts) if text is None]
+        extracted = extract_texts([(files[j].type, files[j].getvalue()) for j in missing])
+        for j, text in zip(missing, extracted):
+            texts[j] = text
+            if text:
+                cache.set(keys[j], text, resident=False)
+        return build_coverage(keywords, [(f.name, text) for f, text in zip(files, texts)])
+
+    key = make_key("coverage", MODEL_NAME, job_description, *(extract_key(f) for f in files))
+    return remember("coverage", "results", key, compute)
 
 # ---------------------------
 # Generate PDF
 # ---------------------------
-def create_pdf(text):
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-    c = canvas.Canvas(temp_file.name, pagesize=A4)
-    width, height = A4
-    y = height - 50
-    for line in text.split("\n"):
-        if y < 50:
-            c.showPage()
-            y = height - 50
-        c.drawString(50, y, line)
-        y -= 15
-    c.save()
-    return temp_file.name
+def create_pdf(text, name="pdf"):
+    def compute():
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer, pagesize=A4)
+        width, height = A4
+        y = height - 50
+        for line in text.split("\n"):
+            if y < 50:
+                c.showPage()
+                y = height - 50
+            c.drawString(50, y, line)
+            y -= 15
+        c.save()
+        return buffer.getvalue()
+
+    return remember(name, "documents", make_key("pdf", text), compute)
+
+# ---------------------------
+# Gauge Rendering
+# ---------------------------
+def render_gauge(gauge, value):
+    if GAUGE_MODE == "svg":
+        st.markdown(gauge.svg(value), unsafe_allow_html=True)
+    else:
+        # The template figure is shared by all sessions
+        with gauge.lock:
+            st.plotly_chart(gauge.figure(value), use_container_width=True)
 
 # ---------------------------
 # Sidebar Layout
@@ -545,16 +583,79 @@ with st.sidebar:
         </div>
         ''', unsafe_allow_html=True)
         page = st.radio("Choose analysis type",
-                        ["🏆 Resume Score", "📊 Detailed Feedback", "🎯 AI Tailored Resume", "✉️ Cover Letter Generator", "🔑 Keyword Optimization"], 
+                        ["🏆 Resume Score", "📊 Detailed Feedback", "🎯 AI Tailored Resume", "✉️ Cover Letter Generator", "🔑 Keyword Optimization", "📋 Bulk Coverage"], 
                         label_visibility="collapsed")
 
+    # Cache statistics for this replica
+    with st.expander("📈 Cache Stats"):
+        stats = cache.stats()
+        st.caption(f"Replica: {stats['replica']}")
+        for tier in stats["tiers"]:
+            st.caption(f"{tier['backend']}: {tier['hit_rate']:.0%} hit rate ({tier['hits']} hits / {tier['misses']} misses)")
+
+    # Model queue statistics for this replica
+    with st.expander("⏱️ Queue Stats"):
+        for name, queue in scheduler.stats().items():
+            st.caption(f"{name}: {queue['queue_depth']} queued, {queue['avg_wait']:.2f}s avg wait, {queue['p95_wait']:.2f}s p95 wait")
+
+    # Memory held by this session and by all sessions on this replica
+    with st.expander("🧠 Session Memory"):
+        for category, size in session_memory.usage(current_tenant()).items():
+            st.caption(f"{category}: {size / 1024:.1f} KB")
+        memory = session_memory.stats()
+        st.caption(f"{memory['sessions']} sessions, {memory['avg_bytes_per_session'] / 1024:.1f} KB avg per session")
+        st.caption(f"Shared cache in memory: {cache.memory_bytes() / 1024:.1f} KB")
+
 # ---------------------------
 # Main Layout
 # ---------------------------
 st.markdown("<div class='main-title'>🚀 AI Resume Analyzer</div>", unsafe_allow_html=True)
 st.markdown("<div class='sub-title'>Transform your resume with AI-powered insights and optimization</div>", unsafe_allow_html=True)
 
-if file:
+if page == "📋 Bulk Coverage":
+    st.subheader("📋 Candidate Keyword Coverage")
+    files = st.file_uploader("Upload candidate resumes", type=["pdf", "docx", "txt"], accept_multiple_files=True)
+
+    if not job_desc:
+        st.info("📝 Please provide a job description in the sidebar to compare candidates.")
+    elif files:
+        session_memory.account(current_tenant(), "bulk_upload", "uploads", sum(f.size for f in files))
+        with st.spinner(f"🔍 Scanning {len(files)} resumes..."):
+            matrix = bulk_coverage(job_desc, files)
+        if matrix.skipped:
+            st.warning(f"⚠️ Could not read {len(matrix.skipped)} resumes: {', '.join(matrix.skipped)}")
+
+        query = st.text_input("Filter candidates", placeholder="e.g. Python AND Kubernetes AND NOT PHP")
+        try:
+            selected = matrix.filter(query)
+        except ValueError as e:
+            st.error(f"⚠️ {e}")
+            selected = []
+
+        st.caption(f"{len(selected)} of {len(matrix.candidates)} candidates match")
+        st.dataframe(matrix.rank(selected), use_container_width=True, hide_index=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label="⬇️ Download CSV",
+                data=matrix.to_csv(selected),
+                file_name="keyword_coverage.csv",
+                mime="text/csv"
+            )
+        with col2:
+            try:
+                st.download_button(
+                    label="⬇️ Download Parquet",
+                    data=matrix.to_parquet(selected),
+                    file_name="keyword_coverage.parquet",
+                    mime="application/octet-stream"
+                )
+            except ImportError as e:
+                st.caption(str(e))
+
+elif file:
+    session_memory.account(current_tenant(), "upload", "uploads", file.size)
     with st.spinner("🔍 Analyzing your resume with AI..."):
         resume_text = extract_text(file)
         
@@ -568,31 +669,7 @@ if file:
             if page == "🏆 Resume Score":
                 st.subheader("📈 Resume Performance Score")
                 
-                # Create custom gauge chart
-                fig = go.Figure(go.Indicator(
-                    mode="gauge+number+delta",
-                    value=score,
-                    domain={'x': [0, 1], 'y': [0, 1]},
-                    title={'text': "Overall Resume Score", 'font': {'size': 24, 'color': '#2d3748'}},
-                    delta={'reference': 80, 'increasing': {'color': "green"}, 'decreasing': {'color': "red"}},
-                    gauge={'axis': {'range': [0, 100], 'tickwidth': 2, 'tickcolor': "#2d3748"},
-                          'bar': {'color': "#667eea", 'thickness': 0.8},
-                          'bgcolor': "white",
-                          'borderwidth': 3,
-                          'bordercolor': "#e2e8f0",
-                          'steps': [{'range': [0, 50], 'color': '#fed7d7'},
-                                   {'range': [50, 80], 'color': '#feebc8'},
-                                   {'range': [80, 100], 'color': '#c6f6d5'}],
-                          'threshold': {'line': {'color': "red", 'width': 4},
-                                       'thickness': 0.8, 'value': 90}}
-                ))
-                fig.update_layout(
-                    height=400,
-                    font={'color': "#2d3748", 'family': "Inter"},
-                    paper_bgcolor="rgba(255,255,255,0.95)",
-                    plot_bgcolor="rgba(255,255,255,0.95)"
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                render_gauge(SCORE_GAUGE, score)
                 
                 # Score interpretation
                 if score >= 80:
@@ -632,14 +709,12 @@ if file:
                     st.text_area("Your tailored resume", tailored_resume, height=500, label_visibility="collapsed")
                     
                     # Download button
-                    pdf_path = create_pdf(tailored_resume)
-                    with open(pdf_path, "rb") as pdf_file:
-                        st.download_button(
-                            label="⬇️ Download Tailored Resume",
-                            data=pdf_file.read(),
-                            file_name="ai_tailored_resume.pdf",
-                            mime="application/pdf"
-                        )
+                    st.download_button(
+                        label="⬇️ Download Tailored Resume",
+                        data=create_pdf(tailored_resume, "tailored_resume_pdf"),
+                        file_name="ai_tailored_resume.pdf",
+                        mime="application/pdf"
+                    )
                 else:
                     st.info("📝 Please provide a job description in the sidebar to generate a tailored resume.")
 
@@ -652,14 +727,12 @@ if file:
                     st.text_area("Your personalized cover letter", cover_letter, height=500, label_visibility="collapsed")
                     
                     # Download button
-                    pdf_path = create_pdf(cover_letter)
-                    with open(pdf_path, "rb") as pdf_file:
-                        st.download_button(
-                            label="⬇️ Download Cover Letter",
-                            data=pdf_file.read(),
-                            file_name="ai_cover_letter.pdf",
-                            mime="application/pdf"
-                        )
+                    st.download_button(
+                        label="⬇️ Download Cover Letter",
+                        data=create_pdf(cover_letter, "cover_letter_pdf"),
+                        file_name="ai_cover_letter.pdf",
+                        mime="application/pdf"
+                    )
                 else:
                     st.info("📝 Please provide a job description in the sidebar to generate a cover letter.")
 
@@ -675,27 +748,7 @@ if file:
                     if total > 0:
                         match_rate = len(matched) / total * 100
                         
-                        fig = go.Figure(go.Indicator(
-                            mode="gauge+number",
-                            value=match_rate,
-                            domain={'x': [0, 1], 'y': [0, 1]},
-                            title={'text': "Keyword Match Rate", 'font': {'size': 24, 'color': '#2d3748'}},
-                            gauge={'axis': {'range': [0, 100], 'tickwidth': 2, 'tickcolor': "#2d3748"},
-                                  'bar': {'color': "#10b981", 'thickness': 0.8},
-                                  'bgcolor': "white",
-                                  'borderwidth': 3,
-                                  'bordercolor': "#e2e8f0",
-                                  'steps': [{'range': [0, 40], 'color': '#fed7d7'},
-                                           {'range': [40, 70], 'color': '#feebc8'},
-                                           {'range': [70, 100], 'color': '#c6f6d5'}]}
-                        ))
-                        fig.update_layout(
-                            height=350,
-                            font={'color': "#2d3748", 'family': "Inter"},
-                            paper_bgcolor="rgba(255,255,255,0.95)",
-                            plot_bgcolor="rgba(255,255,255,0.95)"
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
+                        render_gauge(KEYWORD_GAUGE, match_rate)
                     
                     # Keywords display
                     col1, col2 = st.columns(2)